@@ -4,6 +4,9 @@ Generate beautiful HTML code review reports with side-by-side comparisons
 """
 
 import subprocess
+import io
+import fnmatch
+import posixpath
 import sys
 import os
 import re
@@ -12,14 +15,105 @@ import argparse
 import html
 import tempfile
 import shutil
+import itertools
+import functools
+import contextlib
+import hashlib
+import gzip
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+# All git invocations avoid the shell and cwd= and pass close_fds=False, so that
+# CPython (3.8+) can start git with posix_spawn() rather than fork()+exec() and
+# doesn't have to copy the parent's page tables for every call. posix_spawn()
+# is only used for an executable given with a directory, hence the which().
+GIT = shutil.which('git') or 'git'
+
+# Ranges with fewer diff lines than this are rendered serially
+PARALLEL_RENDER_MIN_LINES = 20000
+
+# Commits whose diff is larger than this (added + removed lines, or diff text
+# size) are shown as a per-file summary instead of a diff, unless --force-full
+LARGE_DIFF_LINES = 5000
+LARGE_DIFF_BYTES = 1 << 20
+
+# Commits with more diff lines than this show only the first DIFF_PREVIEW_LINES
+# lines of each file inline; the rest of the file goes into a collapsed <details>
+DIFF_FOLD_MIN_LINES = 200
+DIFF_PREVIEW_LINES = 50
+
+# Commits with more diff lines than this are rendered as one escaped <pre> block
+# instead of a div per line, which keeps the page's DOM small for huge commits
+RAW_DIFF_MIN_LINES = 2000
+
+# Options for every git command that computes diffs: skip textconv filters and external
+# diff drivers, show submodule bumps as commit ids only (never a log of the submodule),
+# and use the histogram algorithm
+_DIFF_FAST_FLAGS = ('--no-textconv', '--no-ext-diff', '--submodule=short', '--diff-algorithm=histogram')
+
+# Similarity threshold used when rename detection is requested with --find-renames
+RENAME_THRESHOLD = '50%'
+
+# Range indexes and rendered commit blocks are cached here across runs. Entries
+# are keyed by resolved commit SHAs, whose content never changes; bump the
+# version whenever the index layout or the rendered HTML changes.
+REVIEW_CACHE_DIR = os.path.join('generated', '.review-cache')
+REVIEW_CACHE_VERSION = 14
+
+# Hunk header, e.g. "@@ -12,7 +12,8 @@ fn main() {", or for a merge's combined diff
+# "@@@ -12,7 -12,6 +12,8 @@@" (line numbers from the first parent and the result)
+_HUNK_RE = re.compile(r'@@+ -(\d+),?\d* (?:-\d+,?\d* )*\+(\d+),?\d* @@')
+
+def escape_text(text):
+    """Escape &, < and > for element content (not attribute values)"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+@functools.lru_cache(maxsize=4096)
+def cached_escape(text):
+    """escape_text for values that repeat across commits, such as authors and file paths"""
+    return escape_text(text)
+
+# Files matching these names (lockfiles, minified bundles) have their diffs collapsed
+GENERATED_FILE_PATTERNS = ('*.lock', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'Cargo.lock',
+                           'go.sum', '*.min.js', '*.min.css')
+
+# "--- a/old" and "+++ b/new" headers of one file's diff; the new path is /dev/null for deletions
+_SECTION_PATH_RE = re.compile(r'^--- (?:a/)?(.*)\n\+\+\+ (?:b/)?(.*)$', re.MULTILINE)
+
+# Proposal ID saved in .review-config, e.g. "ID := 138584"
+_ID_RE = re.compile(r'ID := (\d+)')
+
+# Abbreviations used in report file names, applied after '/' has become '-'
+_SLUG_MAP = {'rs-': '', 'sns-governance': 'sns-gov', 'nns-governance': 'nns-gov'}
+_SLUG_RE = re.compile('|'.join(re.escape(key) for key in _SLUG_MAP))
+
+def slugify(path):
+    """Short file-name form of a review path, e.g. rs/sns/governance -> sns-gov"""
+    return _SLUG_RE.sub(lambda m: _SLUG_MAP[m.group(0)], path.replace('/', '-'))
+
+# A full or abbreviated commit hash, as opposed to a ref name such as HEAD
+_SHA_RE = re.compile(r'[0-9a-f]{7,40}')
+
+# Start of each file's section in a commit's diff text; merges use "diff --cc <path>"
+_FILE_START_RE = re.compile(r'^diff --(?:git|cc) ', re.MULTILINE)
+
+# Diff line kind by first character; anything else is rendered as context
+_LINE_KINDS = {'+': 'added', '-': 'removed', '@': 'hunk'}
 
 def clone_external_repo(repo_url):
-    """Clone external repository to temporary directory"""
-    temp_dir = tempfile.mkdtemp(prefix='html_review_')
+    """Clone external repository to temporary directory
+
+    The clone is bare and blobless: only `git log`/`show` style commands are
+    run against it, so no working tree is needed and blobs are fetched only
+    for the commits whose diffs are rendered. It lives on tmpfs when
+    /dev/shm is available, where it holds RAM until removed: the caller owns
+    the returned directory and must delete it (shutil.rmtree) when done.
+    """
+    temp_dir = tempfile.mkdtemp(prefix='html_review_', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
     try:
         print(f"📥 Cloning repository: {repo_url}")
-        result = subprocess.run(['git', 'clone', repo_url, temp_dir], 
-                              capture_output=True, text=True, check=True)
+        result = subprocess.run([GIT, 'clone', '--bare', '--filter=blob:none', repo_url, temp_dir],
+                              capture_output=True, text=True, check=True, close_fds=False)
         print(f"✅ Repository cloned to: {temp_dir}")
         return temp_dir
     except subprocess.CalledProcessError as e:
@@ -27,8 +121,48 @@ def clone_external_repo(repo_url):
         shutil.rmtree(temp_dir, ignore_errors=True)
         return None
 
-def get_cached_repo(repo_url, cache_dir):
-    """Get or clone repository to cache directory"""
+def write_commit_graph(repo_dir):
+    """Write a commit-graph with changed-path Bloom filters for repo_dir
+
+    Path-scoped `git log` consults the Bloom filters to skip commits that
+    cannot touch the requested paths instead of diffing every commit.
+    """
+    print(f"📈 Writing commit-graph...")
+    result = subprocess.run(git_argv(['commit-graph', 'write', '--reachable', '--changed-paths'], repo_dir),
+                            capture_output=True, text=True, check=False, close_fds=False)
+    if result.returncode != 0:
+        print(f"⚠️  Warning: Failed to write commit-graph: {result.stderr.strip()}")
+
+def normalize_review_paths(paths):
+    """Turn user-supplied review paths into exact pathspecs
+
+    A directory pathspec already matches everything below it, while a
+    trailing glob such as "rs/sns/*" makes git fall back to wildcard
+    matching and bypass the commit-graph Bloom filters.
+    """
+    if not paths:
+        return paths
+    normalized = []
+    for path in paths:
+        while path.endswith('/*') or path.endswith('/'):
+            path = path[:-2] if path.endswith('/*') else path[:-1]
+        if path and path not in normalized:
+            normalized.append(path)
+    return normalized
+
+def has_commits(repo_dir, commits):
+    """Check that every commit (full or abbreviated hash) exists in repo_dir, using one cat-file"""
+    result = subprocess.run(git_argv(['cat-file', '--batch-check'], repo_dir),
+                            input=''.join(f"{commit}^{{commit}}\n" for commit in commits),
+                            capture_output=True, text=True, check=False, close_fds=False)
+    lines = result.stdout.splitlines()
+    return result.returncode == 0 and len(lines) == len(commits) and all(line.split()[1:2] == ['commit'] for line in lines)
+
+def get_cached_repo(repo_url, cache_dir, commit_graph=True, commits=()):
+    """Get or clone repository to cache directory
+
+    An existing cache is only updated when one of commits is not a hash already in it.
+    """
     # Create a safe directory name from the repo URL
     repo_name = repo_url.split('/')[-1].replace('.git', '')
     if not repo_name:
@@ -36,13 +170,23 @@ def get_cached_repo(repo_url, cache_dir):
     
     cached_repo_path = os.path.join(cache_dir, repo_name)
     
-    if os.path.exists(cached_repo_path):
+    # Hashes never change, unlike refs such as HEAD which have to follow the remote
+    pinned = bool(commits) and all(_SHA_RE.fullmatch(commit) for commit in commits)
+    
+    if os.path.exists(cached_repo_path) and pinned and has_commits(cached_repo_path, commits):
+        print(f"🔄 Using cached repository: {cached_repo_path}")
+        print(f"✅ Requested commits already cached, skipping update")
+        # Nothing new to index if an earlier run already wrote the commit-graph
+        commit_graph = commit_graph and not os.path.exists(
+            os.path.join(cached_repo_path, '.git', 'objects', 'info', 'commit-graph'))
+    elif os.path.exists(cached_repo_path):
         print(f"🔄 Using cached repository: {cached_repo_path}")
         print(f"📥 Updating repository...")
         try:
-            # Update the cached repository
-            subprocess.run(['git', 'pull'], cwd=cached_repo_path, 
-                         capture_output=True, text=True, check=True)
+            # Missing hashes only need the objects; refs need the branch moved as well
+            argv = ['fetch', '--quiet', 'origin'] if pinned else ['pull', '--quiet']
+            subprocess.run(git_argv(argv, cached_repo_path),
+                         capture_output=True, text=True, check=True, close_fds=False)
             print(f"✅ Repository updated")
         except subprocess.CalledProcessError as e:
             print(f"⚠️  Warning: Failed to update repository: {e}")
@@ -51,78 +195,81 @@ def get_cached_repo(repo_url, cache_dir):
         print(f"📥 Cloning repository to cache: {repo_url}")
         try:
             os.makedirs(cache_dir, exist_ok=True)
-            subprocess.run(['git', 'clone', repo_url, cached_repo_path], 
-                         capture_output=True, text=True, check=True)
+            subprocess.run([GIT, 'clone', repo_url, cached_repo_path],
+                         capture_output=True, text=True, check=True, close_fds=False)
             print(f"✅ Repository cached to: {cached_repo_path}")
         except subprocess.CalledProcessError as e:
             print(f"❌ Failed to clone repository: {e}")
             return None
     
+    if commit_graph:
+        write_commit_graph(cached_repo_path)
+    
     return cached_repo_path
 
-def run_git_command(cmd, cwd=None):
-    """Run a git command and return the output"""
+def git_argv(argv, repo_dir=None):
+    """Build a full git command line, using `git -C` to target repo_dir"""
+    if repo_dir:
+        return [GIT, '-C', repo_dir] + argv
+    return [GIT] + argv
+
+def rename_option(find_renames=False):
+    """git diff option for rename detection, which is off unless explicitly requested"""
+    return f'--find-renames={RENAME_THRESHOLD}' if find_renames else '--no-renames'
+
+def history_options(first_parent=False):
+    """git log options selecting which commits of the range are reviewed"""
+    return ['--first-parent'] if first_parent else []
+
+def merge_diff_option(first_parent=False):
+    """How merges are diffed: against their first parent when they stand in for a whole
+    branch (--first-parent), otherwise as a combined diff like `git show`"""
+    return '--diff-merges=first-parent' if first_parent else '--cc'
+
+def run_git_command(argv, repo_dir=None):
+    """Run a git command (argv list without the leading 'git') and return the output"""
+    cmd = git_argv(argv, repo_dir)
     try:
-        result = subprocess.run(cmd, shell=True, cwd=cwd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, close_fds=False)
         if result.returncode != 0:
-            print(f"Error running command: {cmd}")
+            print(f"Error running command: {' '.join(cmd)}")
             print(f"Error: {result.stderr}")
             return ""
         return result.stdout.strip()
     except Exception as e:
-        print(f"Exception running command: {cmd}")
+        print(f"Exception running command: {' '.join(cmd)}")
         print(f"Exception: {e}")
         return ""
 
-def get_commit_stats(start_commit, end_commit, paths=None, repo_dir=None):
-    """Get statistics for the commit range"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
-    
-    # Count commits
-    commit_count = run_git_command(f"git rev-list --count {start_commit}..{end_commit}{path_filter}", repo_dir)
-    
-    # Get file list
-    files_output = run_git_command(f"git diff --name-only {start_commit}..{end_commit}{path_filter}", repo_dir)
-    files = [f for f in files_output.split('\n') if f.strip()]
-    file_count = len(files)
-    
-    # Get diff stats
-    diff_stats = run_git_command(f"git diff --stat {start_commit}..{end_commit}{path_filter}", repo_dir)
-    
-    # Parse lines added/removed from the last line of diff --stat
-    lines_added = 0
-    lines_removed = 0
-    if diff_stats:
-        lines = diff_stats.split('\n')
-        if lines:
-            last_line = lines[-1]
-            if '|' in last_line:
-                parts = last_line.split('|')
-                if len(parts) >= 2:
-                    changes = parts[1].strip()
-                    if '+' in changes and '-' in changes:
-                        # Extract numbers from "X files changed, Y insertions(+), Z deletions(-)"
-                        insertions = re.search(r'(\d+)\s*insertions?', changes)
-                        deletions = re.search(r'(\d+)\s*deletions?', changes)
-                        if insertions:
-                            lines_added = int(insertions.group(1))
-                        if deletions:
-                            lines_removed = int(deletions.group(1))
-    
-    return {
-        'commits': commit_count,
-        'files': file_count,
-        'lines_added': lines_added,
-        'lines_removed': lines_removed,
-        'file_list': files
-    }
+def review_cache_path(kind, *key_parts):
+    """Get the review cache file for a (kind, key) pair"""
+    key = '|'.join(str(part) for part in (REVIEW_CACHE_VERSION, kind) + key_parts)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(REVIEW_CACHE_DIR, f"{digest}.{kind}.gz")
+
+def read_review_cache(path):
+    """Read a cached entry, or None if it is missing or unreadable"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+def write_review_cache(path, text):
+    """Write a cache entry; failures only cost a cache miss next time"""
+    try:
+        os.makedirs(REVIEW_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Warning: Failed to write review cache: {e}")
+
+def resolve_range(start_commit, end_commit, repo_dir=None):
+    """Resolve both ends of a range to commit SHAs, or None if either is invalid"""
+    shas = run_git_command(['rev-parse', f'{start_commit}^{{commit}}', f'{end_commit}^{{commit}}'], repo_dir).split()
+    return shas if len(shas) == 2 else None
 
 def get_commit_type(message):
     """Detect commit type from message"""
@@ -144,77 +291,291 @@ def get_commit_type(message):
     else:
         return 'other'
 
-def get_commits(start_commit, end_commit, paths=None, repo_dir=None):
-    """Get list of commits in the range"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
+class RangeIndex:
+    """Commits, files, line counts and diffs of a commit range, read from a single git log pass"""
     
-    format_str = "%H|%s|%an|%ad"
-    output = run_git_command(f"git log --format='{format_str}' --date=short {start_commit}..{end_commit}{path_filter}", repo_dir)
-    commits = []
-    for line in output.split('\n'):
-        if line.strip():
-            parts = line.split('|', 3)
-            if len(parts) >= 4:
-                commit_type = get_commit_type(parts[1])
-                commits.append({
-                    'hash': parts[0],
-                    'message': parts[1],
-                    'author': parts[2],
-                    'date': parts[3],
-                    'type': commit_type
-                })
-    return commits
-
-def get_commit_details(commit_hash, paths=None, repo_dir=None):
-    """Get detailed information about a specific commit"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
+    # Indexes already built in this process, keyed by (start, end, paths, repo_dir, force_full, with_diffs, find_renames, first_parent)
+    _built = {}
     
-    # Get commit info
-    author = run_git_command(f"git show --no-patch --format='%an <%ae>' {commit_hash}", repo_dir)
-    date = run_git_command(f"git show --no-patch --format='%ad' --date=short {commit_hash}", repo_dir)
-    message = run_git_command(f"git show --no-patch --format='%s' {commit_hash}", repo_dir)
+    @classmethod
+    def for_range(cls, start_commit, end_commit, paths=None, repo_dir=None, force_full=False, with_diffs=True, find_renames=False,
+                  first_parent=False):
+        """Get the index for a range, building it on first use"""
+        if paths and not isinstance(paths, list):
+            paths = [paths]
+        key = (start_commit, end_commit, tuple(paths or ()), repo_dir, force_full, with_diffs, find_renames, first_parent)
+        if key in cls._built:
+            return cls._built[key]
+        
+        # Only ranges between resolved SHAs are immutable and safe to cache on disk
+        cache_path = None
+        shas = resolve_range(start_commit, end_commit, repo_dir)
+        if shas:
+            cache_path = review_cache_path('index', *shas, ','.join(paths or ()), force_full, with_diffs, find_renames,
+                                            first_parent)
+            cached = read_review_cache(cache_path)
+            if cached is not None:
+                index = cls.__new__(cls)
+                index.__dict__.update(json.loads(cached))
+                cls._built[key] = index
+                return index
+        
+        index = cls(start_commit, end_commit, paths, repo_dir, force_full, with_diffs, find_renames, first_parent)
+        # A failed git log leaves a partial index, which must not outlive this run
+        if cache_path and not index.failed:
+            index.cache_key = cache_path
+            write_review_cache(cache_path, json.dumps(index.__dict__))
+        cls._built[key] = index
+        return index
     
-    # Get files changed
-    files = run_git_command(f"git show --name-only --format='' {commit_hash}{path_filter}", repo_dir)
-    file_list = [f for f in files.split('\n') if f.strip()]
+    def __init__(self, start_commit, end_commit, paths=None, repo_dir=None, force_full=False, with_diffs=True, find_renames=False,
+                 first_parent=False):
+        self.commits = []     # commit table rows, in git log order
+        self.by_hash = {}     # commit hash -> details (author, date, message, files, numstat, diff lines)
+        self.files = []       # sorted paths touched by any commit in the range
+        self.lines_added = 0
+        self.lines_removed = 0
+        self.force_full = force_full
+        self.with_diffs = with_diffs
+        self.find_renames = find_renames
+        self.first_parent = first_parent
+        self.cache_key = None  # review cache path of this index, when it is cacheable
+        self.failed = False    # whether git log failed, leaving the index incomplete
+        self._load(start_commit, end_commit, paths, repo_dir)
     
-    # Get diff
-    diff = run_git_command(f"git show {commit_hash}{path_filter}", repo_dir)
+    def get(self, commit_hash):
+        """Get detailed information about a specific commit"""
+        return self.by_hash[commit_hash]
     
-    return {
-        'author': author,
-        'date': date,
-        'message': message,
-        'files': file_list,
-        'diff': diff
-    }
-
-def format_diff_as_html(diff_text, commit_hash, repo_url=None):
-    """Convert git diff to HTML with syntax highlighting and GitHub links"""
-    if not diff_text:
-        return ""
+    def stats(self):
+        """Get statistics for the commit range"""
+        return {
+            'commits': len(self.commits),
+            'files': len(self.files),
+            'lines_added': self.lines_added,
+            'lines_removed': self.lines_removed,
+            'file_list': self.files
+        }
     
-    lines = diff_text.split('\n')
-    html_lines = []
-    current_file = None
+    def _load(self, start_commit, end_commit, paths, repo_dir):
+        # Each commit starts with a \x01 marker line carrying \x1f-separated metadata,
+        # followed by its --raw and --numstat entries and then (with_diffs) its patch
+        argv = ['log', '--raw', '--numstat'] + (['--patch'] if self.with_diffs else []) + [rename_option(self.find_renames), *_DIFF_FAST_FLAGS,
+                merge_diff_option(self.first_parent), '--date=short', '--format=%x01%H%x1f%an%x1f%ae%x1f%ad%x1f%P%x1f%s',
+                *history_options(self.first_parent),
+                f'{start_commit}..{end_commit}']
+        if paths:
+            argv += ['--'] + paths
+        cmd = git_argv(argv, repo_dir)
+        
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, encoding='utf-8', errors='replace',
+                                    bufsize=1 << 20, close_fds=False)
+        except OSError as e:
+            print(f"Exception running command: {' '.join(cmd)}")
+            print(f"Exception: {e}")
+            self.failed = True
+            return
+        
+        files = set()
+        commit = None
+        details = None
+        diff_lines = []
+        in_patch = False
+        keep_diff = False
+        diff_size = 0
+        combined = False
+        with proc:
+            for line in proc.stdout:
+                if in_patch:
+                    # Patch lines are kept as read, newline included, and joined
+                    # into one string per commit once the next commit starts
+                    if line.startswith('\x01'):
+                        self._finish_diff(details, diff_lines)
+                    else:
+                        if keep_diff:
+                            diff_lines.append(line)
+                            diff_size += len(line)
+                            if diff_size > LARGE_DIFF_BYTES and not self.force_full:
+                                # Stop holding this commit's diff; it will be summarized
+                                diff_lines.clear()
+                                keep_diff = False
+                                details['diff_skipped'] = True
+                        continue
+                line = line.rstrip('\n')
+                if line.startswith('\x01'):
+                    commit_hash, author, email, date, parents, message = line[1:].split('\x1f', 5)
+                    # Merges get a combined diff (--cc) unless they stand in for their branch
+                    combined = not self.first_parent and len(parents.split()) > 1
+                    commit = {
+                        'hash': commit_hash,
+                        'message': message,
+                        'author': author,
+                        'date': date,
+                        'type': get_commit_type(message),
+                        'lines_added': 0,
+                        'lines_removed': 0
+                    }
+                    details = {
+                        'author': f"{author} <{email}>",
+                        'date': date,
+                        'message': message,
+                        'files': [],
+                        'numstat': [],
+                        'diff': '',
+                        'diff_skipped': False
+                    }
+                    in_patch = False
+                    self.commits.append(commit)
+                    self.by_hash[commit_hash] = details
+                elif commit is None:
+                    continue
+                elif line.startswith(':'):
+                    # --raw entry, "::"-prefixed for a combined merge; the last
+                    # tab-separated field is the (new) path
+                    path = line.rsplit('\t', 1)[-1]
+                    details['files'].append(path)
+                    files.add(path)
+                elif combined and (line[:1].isdigit() or line.startswith('-\t')):
+                    # A merge's numstat is against its first parent and comes before the
+                    # combined --raw entries; those lines are counted in the merged commits
+                    continue
+                elif line[:1].isdigit() or line.startswith('-\t'):
+                    # --numstat entry; binary files report "-" for both counts
+                    added, removed, _ = line.split('\t', 2)
+                    added = int(added) if added != '-' else 0
+                    removed = int(removed) if removed != '-' else 0
+                    # numstat entries come in the same order as the --raw ones
+                    path = details['files'][len(details['numstat'])]
+                    details['numstat'].append((added, removed, path))
+                    commit['lines_added'] += added
+                    commit['lines_removed'] += removed
+                    self.lines_added += added
+                    self.lines_removed += removed
+                elif line:
+                    # First patch line; the commit's size is known from numstat by now
+                    in_patch = True
+                    keep_diff = (self.force_full
+                                 or commit['lines_added'] + commit['lines_removed'] <= LARGE_DIFF_LINES)
+                    if keep_diff:
+                        diff_lines.append(line + '\n')
+                        diff_size = len(line) + 1
+                    else:
+                        details['diff_skipped'] = True
+            if in_patch:
+                self._finish_diff(details, diff_lines)
+        
+        self.files = sorted(files)
+        
+        if proc.returncode != 0:
+            print(f"Error running command: {' '.join(cmd)}")
+            self.failed = True
+    
+    @staticmethod
+    def _finish_diff(details, diff_lines):
+        # One string per commit costs far less than a string object per line,
+        # and is what the disk cache and the render workers receive.
+        # Trailing blank lines are the separators git emits between commits.
+        details['diff'] = ''.join(diff_lines).rstrip('\n')
+        diff_lines.clear()
+
+def get_commit_details(commit_hash, index):
+    """Get detailed information about a specific commit from the range's RangeIndex"""
+    return index.get(commit_hash)
+
+def is_generated_file(path):
+    """Check whether a path is a lockfile or other generated file"""
+    name = posixpath.basename(path)
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in GENERATED_FILE_PATTERNS)
+
+def diff_section_path(section):
+    """Get the path a single file's diff applies to"""
+    match = _SECTION_PATH_RE.search(section)
+    if match:
+        old_path, new_path = match.groups()
+        return old_path if new_path == '/dev/null' else new_path
+    # No ---/+++ headers (e.g. binary files); fall back to the "diff --git a/... b/..."
+    # or "diff --cc <path>" line
+    first_line = section.split('\n', 1)[0]
+    if first_line.startswith('diff --cc '):
+        return first_line[len('diff --cc '):]
+    return first_line.rsplit(' b/', 1)[-1]
+
+def format_diff_as_html(diff_text):
+    """Convert git diff text to HTML with syntax highlighting, yielding one line at a time
+
+    Each file's lines are wrapped in a file-section carrying the path; the page
+    script builds a line's GitHub link from it when the line is first hovered.
+    Diffs longer than RAW_DIFF_MIN_LINES are emitted as a single <pre> block,
+    and generated files or files whose hunks repeat an earlier file's are
+    collapsed.
+    """
+    line_count = diff_text.count('\n') + 1
+    if line_count > RAW_DIFF_MIN_LINES:
+        yield f'<pre class="diff-raw">{escape_text(diff_text)}</pre>\n'
+        return
+    
+    fold = line_count > DIFF_FOLD_MIN_LINES
     line_numbers = {'old': 0, 'new': 0}
+    seen_hunks = {}  # digest of a file's hunks -> the first file with those hunks
+    starts = [match.start() for match in _FILE_START_RE.finditer(diff_text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    ends = [start - 1 for start in starts[1:]] + [len(diff_text)]
+    for start, end in zip(starts, ends):
+        section = diff_text[start:end]
+        hunks_start = section.find('\n@@')
+        if hunks_start == -1:
+            yield from format_file_diff(section, fold, line_numbers)
+            continue
+        
+        path = diff_section_path(section)
+        hunks = section[hunks_start + 1:]
+        digest = hashlib.blake2b(hunks.encode(), digest_size=8).digest()
+        if is_generated_file(path):
+            reason = 'generated file'
+        elif digest in seen_hunks:
+            reason = f'same changes as {seen_hunks[digest]}'
+        else:
+            seen_hunks[digest] = path
+            yield from format_file_diff(section, fold, line_numbers)
+            continue
+        
+        # Hunks only hold file headers at their start, so every "\n+"/"\n-" is a changed line
+        added = hunks.count('\n+')
+        removed = hunks.count('\n-')
+        yield (f'<details class="diff-fold"><summary>+{added}/-{removed} lines in {cached_escape(path)} '
+               f'(auto-hidden: {escape_text(reason)})</summary>\n'
+               f'<pre class="diff-raw">{escape_text(section)}</pre>\n</details>\n')
+
+def format_file_diff(section, fold, line_numbers):
+    """Render one file's section of a diff as HTML lines, yielding one line at a time"""
+    current_file = None
+    in_section = False
+    in_hunk = False
     
-    for line in lines:
-        if line.startswith('+++') or line.startswith('---'):
+    # Past the preview, the rest of a long file's diff goes into a collapsed <details>
+    fold_start = None
+    fold_end = None
+    if fold:
+        section_lines = section.count('\n') + 1
+        if section_lines > DIFF_PREVIEW_LINES:
+            fold_start = DIFF_PREVIEW_LINES
+            fold_end = section_lines
+    
+    # Iterating a StringIO splits lines lazily instead of building a list of them
+    for n, line in enumerate(io.StringIO(section)):
+        line = line.rstrip('\n')
+        if n == fold_start:
+            yield f'<details class="diff-fold"><summary>Show {fold_end - n} more lines</summary>\n'
+        
+        kind = _LINE_KINDS.get(line[:1], 'context')
+        if not in_hunk and kind in ('added', 'removed') and line[:3] in ('+++', '---'):
+            kind = 'file'
+        elif kind == 'hunk' and not line.startswith('@@'):
+            kind = 'context'
+        
+        if kind == 'file':
             # File headers
             if line.startswith('+++'):
                 current_file = line[4:].strip()
@@ -226,100 +587,221 @@ def format_diff_as_html(diff_text, commit_hash, repo_url=None):
                 # Also handle 'a/' prefix for removed files
                 if current_file and current_file.startswith('a/'):
                     current_file = current_file[2:]
-            html_lines.append(f'<div class="file-header">{html.escape(line)}</div>')
-        elif line.startswith('@@'):
+            yield f'<div class="file-header">{escape_text(line)}</div>\n'
+            if current_file:
+                in_section = True
+                yield f'<div class="file-section" data-file="{html.escape(current_file)}">\n'
+        elif kind == 'hunk':
             # Hunk headers - parse line numbers
-            import re
-            match = re.search(r'@@ -(\d+),?\d* \+(\d+),?\d* @@', line)
+            in_hunk = True
+            match = _HUNK_RE.match(line)
             if match:
                 line_numbers['old'] = int(match.group(1)) - 1
                 line_numbers['new'] = int(match.group(2)) - 1
-            html_lines.append(f'<div class="hunk-header">{html.escape(line)}</div>')
-        elif line.startswith('+'):
+            yield f'<div class="hunk-header">{escape_text(line)}</div>\n'
+        elif kind == 'added':
             # Added lines
             line_numbers['new'] += 1
-            github_link = ""
-            if current_file and line_numbers['new'] > 0:
-                github_url = f"{repo_url}/blob/{commit_hash}/{current_file}#L{line_numbers['new']}"
-                github_link = f'<a href="{github_url}" class="github-link" target="_blank">🔗</a>'
-            html_lines.append(f'<div class="line added"><span class="line-number">+{line_numbers["new"]}</span><span class="line-content">{html.escape(line[1:])}{github_link}</span></div>')
-        elif line.startswith('-'):
+            yield f'<div class="line added"><span class="line-number">+{line_numbers["new"]}</span><span class="line-content">{escape_text(line[1:])}</span></div>\n'
+        elif kind == 'removed':
             # Removed lines
             line_numbers['old'] += 1
-            github_link = ""
-            if current_file and line_numbers['old'] > 0:
-                github_url = f"{repo_url}/blob/{commit_hash}~1/{current_file}#L{line_numbers['old']}"
-                github_link = f'<a href="{github_url}" class="github-link" target="_blank">🔗</a>'
-            html_lines.append(f'<div class="line removed"><span class="line-number">-{line_numbers["old"]}</span><span class="line-content">{html.escape(line[1:])}{github_link}</span></div>')
+            yield f'<div class="line removed"><span class="line-number">-{line_numbers["old"]}</span><span class="line-content">{escape_text(line[1:])}</span></div>\n'
         else:
-            # Context lines
+            # Context lines (and the "diff --git"/index lines that start the file)
             line_numbers['old'] += 1
             line_numbers['new'] += 1
-            github_link = ""
-            if current_file and line_numbers['new'] > 0:
-                github_url = f"{repo_url}/blob/{commit_hash}/{current_file}#L{line_numbers['new']}"
-                github_link = f'<a href="{github_url}" class="github-link" target="_blank">🔗</a>'
-            html_lines.append(f'<div class="line context"><span class="line-number">{line_numbers["new"]}</span><span class="line-content">{html.escape(line)}{github_link}</span></div>')
+            yield f'<div class="line context"><span class="line-number">{line_numbers["new"]}</span><span class="line-content">{escape_text(line)}</span></div>\n'
     
-    return '\n'.join(html_lines)
+    if fold_start is not None:
+        yield '</details>\n'
+    if in_section:
+        yield '</div>\n'
 
-def generate_html_report(start_commit, end_commit, paths=None, output_file=None, repo_url=None, proposal_id=None, repo_dir=None):
-    """Generate a comprehensive HTML review report with side-by-side view"""
+# Parts of a commit's detail block, filled in with str.format_map
+_COMMIT_HEADER_TMPL = """
+                <div class="commit-detail">
+                    <div class="commit-header">
+                        <div class="commit-title">
+                            <a href="{commit_url}" class="commit-hash-large" target="_blank">{hash}</a>
+                            <span class="badge {badge_class}">{type}</span>
+                        </div>
+                        <div class="commit-meta">
+                            <span>👤 {author}</span>
+                            <span>📅 {date}</span>
+                            <span>📁 {file_count} files</span>
+                        </div>
+                        <div style="margin-top: 8px; color: #e6edf3; font-size: 0.9em;">
+                            {message}
+                        </div>
+                        <div class="commit-actions">
+                            <button class="toggle-button secondary" onclick="toggleFiles('files-{i}')">📁 Files ({file_count})</button>"""
+
+_DIFF_BUTTON_TMPL = """
+                            <button class="toggle-button" onclick="toggleDiff('diff-{i}')">🔍 Code Changes</button>"""
+
+_FILES_LIST_TMPL = """
+                        <div id="files-{i}" class="collapsible">
+                            <div class="files-list">
+                                <ul>{items}</ul></div></div>"""
+
+_SKIPPED_DIFF_TMPL = """
+                        <div id="diff-{i}" class="collapsible">
+                            <div class="diff-container">
+                                <div class="hunk-header">Diff too large to display ({changed} lines changed) - <a href="{commit_url}" class="github-link-inline" target="_blank">view it on GitHub</a></div>{files}
+                            </div>
+                        </div>"""
+
+_DIFF_OPEN_TMPL = """
+                        <div id="diff-{i}" class="collapsible">
+                            <div class="diff-container" data-blob-url="{blob_url}">
+                                """
+
+# With --lazy-diffs the diff is left out of the report and loaded from diffs/<hash>.js
+_LAZY_DIFF_TMPL = """
+                        <div id="diff-{i}" class="collapsible">
+                            <div class="diff-container" data-blob-url="{blob_url}" data-diff-src="diffs/{hash}.js" data-diff-hash="{hash}">
+                                <div class="hunk-header">Loading diff...</div>"""
+
+_DIFF_CLOSE = """
+                            </div>
+                        </div>"""
+
+_COMMIT_CLOSE = """
+                    </div>
+                </div>"""
+
+def iter_commit_html(i, commit, details, repo_url=None, lazy_diffs=False):
+    """Render one commit's detail block as HTML, yielding fragments
+
+    With lazy_diffs the diff gets a placeholder; write_diff_sidecars renders it.
+    """
+    badge_class = commit['type'] if commit['type'] in ['feat', 'fix', 'chore', 'docs', 'refactor'] else 'chore'
+    commit_url = f"{repo_url}/commit/{commit['hash']}"
     
-    if output_file is None:
-        # Generate filename with proposal ID and date (if available from config)
-        from datetime import datetime
-        date_str = datetime.now().strftime('%Y%m%d')
-        proposal_id = None
-        
-        # Try to read proposal ID from config file
-        config_file = '.review-config'
-        if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                config_content = f.read()
-                id_match = re.search(r'ID := (\d+)', config_content)
-                if id_match:
-                    proposal_id = id_match.group(1)
-        
-        if proposal_id:
-            # Extract repo name from repo_url or use default
-            if repo_url and repo_url != 'https://github.com/dfinity/ic':
-                repo_name = repo_url.split('/')[-1].replace('.git', '')
-                if not repo_name:
-                    repo_name = repo_url.split('/')[-2]
-            else:
-                repo_name = 'ic'
-            folder_name = f"{proposal_id}-{repo_name}-{date_str}"
-        else:
-            # Fallback to old format if no proposal ID
-            if paths:
-                if isinstance(paths, list):
-                    path_short = '-'.join([p.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov') for p in paths])
-                else:
-                    path_short = paths.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov')
-            else:
-                path_short = 'all-changes'
-            commit_short = f"{start_commit[:8]}-{end_commit[:8]}"
-            folder_name = f"{date_str}-review-{path_short}-{commit_short}"
-        os.makedirs(f"generated/{folder_name}", exist_ok=True)
-        output_file = f"generated/{folder_name}/{folder_name}.html"
+    # Everything up to the diff is joined into one fragment
+    parts = [_COMMIT_HEADER_TMPL.format_map({
+        'i': i,
+        'commit_url': commit_url,
+        'hash': commit['hash'],
+        'badge_class': badge_class,
+        'type': commit['type'],
+        'author': cached_escape(details['author']),
+        'date': details['date'],
+        'file_count': len(details['files']),
+        'message': escape_text(details['message']),
+    })]
+    if details['diff'] or details['diff_skipped']:
+        parts.append(_DIFF_BUTTON_TMPL.format(i=i))
+    parts.append("""
+                        </div>""")
     
-    print(f"Generating HTML report for {start_commit}..{end_commit}")
+    if details['files']:
+        items = ''.join([f"<li>{cached_escape(file)}</li>" for file in details['files']])
+        parts.append(_FILES_LIST_TMPL.format(i=i, items=items))
     
-    # Get statistics
-    stats = get_commit_stats(start_commit, end_commit, paths, repo_dir)
-    commits = get_commits(start_commit, end_commit, paths, repo_dir)
+    if details['diff_skipped']:
+        files = ''.join([f'<div class="file-header"><span class="stat-added">+{added}</span><span class="stat-removed">-{removed}</span>{cached_escape(path)}</div>\n'
+                         for added, removed, path in details['numstat']])
+        parts.append(_SKIPPED_DIFF_TMPL.format(i=i, changed=commit['lines_added'] + commit['lines_removed'],
+                                               commit_url=commit_url, files=files))
+        parts.append(_COMMIT_CLOSE)
+        yield ''.join(parts)
+    elif details['diff'] and lazy_diffs:
+        parts.append(_LAZY_DIFF_TMPL.format(i=i, blob_url=f"{repo_url}/blob/{commit['hash']}", hash=commit['hash']))
+        parts.append(_DIFF_CLOSE + _COMMIT_CLOSE)
+        yield ''.join(parts)
+    elif details['diff']:
+        parts.append(_DIFF_OPEN_TMPL.format(i=i, blob_url=f"{repo_url}/blob/{commit['hash']}"))
+        yield ''.join(parts)
+        yield from format_diff_as_html(details['diff'])
+        yield _DIFF_CLOSE + _COMMIT_CLOSE
+    else:
+        parts.append(_COMMIT_CLOSE)
+        yield ''.join(parts)
+
+def render_commit_html(i, commit, details, repo_url=None, lazy_diffs=False):
+    """Render one commit's detail block as a single HTML string"""
+    return ''.join(iter_commit_html(i, commit, details, repo_url, lazy_diffs))
+
+def render_diff_sidecar(commit_hash, diff_text):
+    """Render a commit's diff as the script that fills its placeholder in a --lazy-diffs report"""
+    diff_html = ''.join(format_diff_as_html(diff_text))
+    return f"renderDiff({json.dumps(commit_hash)}, {json.dumps(diff_html)});\n"
+
+def write_diff_sidecars(commits, index, diff_dir):
+    """Write diffs/<hash>.js for every commit with an inline diff, in worker processes
+    for large ranges"""
+    todo = []
+    for commit in commits:
+        details = get_commit_details(commit['hash'], index)
+        if details['diff'] and not details['diff_skipped']:
+            todo.append((commit['hash'], details['diff']))
+    if not todo:
+        return
+    os.makedirs(diff_dir, exist_ok=True)
     
-    with open(output_file, 'w') as f:
-        # HTML header with CSS
-        f.write("""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Code Review Report</title>
-    <style>
-        * {
+    total_lines = sum(diff.count('\n') + 1 for _, diff in todo)
+    workers = os.cpu_count() or 1
+    executor = None
+    if total_lines >= PARALLEL_RENDER_MIN_LINES and workers >= 2 and len(todo) >= 2:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        rendered = executor.map(render_diff_sidecar, *zip(*todo), chunksize=max(1, len(todo) // (4 * workers)))
+    else:
+        rendered = map(render_diff_sidecar, *zip(*todo))
+    try:
+        for (commit_hash, _), script in zip(todo, rendered):
+            with open_report(os.path.join(diff_dir, f"{commit_hash}.js"), encoding='utf-8') as f:
+                f.write(script)
+    finally:
+        if executor:
+            executor.shutdown()
+
+def iter_commits_html(commits, index, repo_url=None, lazy_diffs=False):
+    """Render the detail blocks of all commits in order, reusing cached blocks and
+    rendering the rest in worker processes for large ranges"""
+    if index.cache_key:
+        cache_paths = [review_cache_path('commit', index.cache_key, i, commit['hash'], repo_url, lazy_diffs)
+                       for i, commit in enumerate(commits)]
+        cached = [read_review_cache(path) for path in cache_paths]
+    else:
+        cache_paths = [None] * len(commits)
+        cached = [None] * len(commits)
+    todo = [i for i, fragment in enumerate(cached) if fragment is None]
+    todo_details = [get_commit_details(commits[i]['hash'], index) for i in todo]
+    total_lines = sum(details['diff'].count('\n') + 1 for details in todo_details if details['diff'])
+    workers = os.cpu_count() or 1
+    parallel = total_lines >= PARALLEL_RENDER_MIN_LINES and workers >= 2 and len(todo) >= 2
+    if not parallel and not index.cache_key:
+        # Nothing to cache and not worth the worker start-up cost; stream straight through
+        for i, details in zip(todo, todo_details):
+            yield from iter_commit_html(i, commits[i], details, repo_url, lazy_diffs)
+        return
+    
+    executor = None
+    todo_commits = [commits[i] for i in todo]
+    if parallel:
+        # Rendering is pure per commit, so workers only need the commit's own data
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(todo) // (4 * workers))
+        rendered = executor.map(render_commit_html, todo, todo_commits, todo_details,
+                                itertools.repeat(repo_url), itertools.repeat(lazy_diffs), chunksize=chunksize)
+    else:
+        rendered = map(render_commit_html, todo, todo_commits, todo_details, itertools.repeat(repo_url),
+                       itertools.repeat(lazy_diffs))
+    try:
+        for i, fragment in enumerate(cached):
+            if fragment is None:
+                fragment = next(rendered)
+                if cache_paths[i]:
+                    write_review_cache(cache_paths[i], fragment)
+            yield fragment
+    finally:
+        if executor:
+            executor.shutdown()
+
+# Stylesheet inlined into every report so a report stays a single shareable file
+_CSS = """        * {
             box-sizing: border-box;
         }
         body {
@@ -544,6 +1026,15 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             max-height: 600px;
             overflow-y: auto;
         }
+        .diff-raw {
+            margin: 0;
+            padding: 8px;
+            font-family: 'SF Mono', 'Monaco', monospace;
+            font-size: 12px;
+            line-height: 1.4;
+            color: #e6edf3;
+            white-space: pre;
+        }
         .file-header {
             background: #21262d;
             padding: 8px 15px;
@@ -566,6 +1057,28 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             color: #8b949e;
             border-bottom: 1px solid #21262d;
         }
+        .stat-added {
+            color: #3fb950;
+            min-width: 60px;
+        }
+        .stat-removed {
+            color: #f85149;
+            min-width: 60px;
+        }
+        .github-link-inline {
+            color: #58a6ff;
+        }
+        .diff-fold > summary {
+            background: #161b22;
+            padding: 6px 15px;
+            font-size: 0.8em;
+            color: #58a6ff;
+            cursor: pointer;
+            border-bottom: 1px solid #21262d;
+        }
+        .diff-fold > summary:hover {
+            color: #79c0ff;
+        }
         .line {
             display: flex;
             font-family: 'SF Mono', 'Monaco', monospace;
@@ -767,7 +1280,17 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
                 padding: 8px 10px;
             }
         }
-    </style>
+"""
+
+# Report header up to the summary; filled in with str.format
+_HEADER_TMPL = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Code Review Report</title>
+    <style>
+{css}    </style>
 </head>
 <body>
     <div class="container">
@@ -776,67 +1299,40 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             <div class="meta">
                 <div class="meta-item">
                     <span>📊</span>
-                    <span><strong>Range:</strong> <code>""")
-        
-        f.write(f"{start_commit[:8]}</code> → <code>{end_commit[:8]}</code>")
-        
-        f.write("""</span>
+                    <span><strong>Range:</strong> <code>{range_start}</code> → <code>{range_end}</code></span>
                 </div>
                 <div class="meta-item">
                     <span>📁</span>
-                    <span><strong>Path:</strong> <code>""")
-        
-        if paths:
-            if isinstance(paths, list):
-                f.write(f"{', '.join(paths)}")
-            else:
-                f.write(f"{paths}")
-        else:
-            f.write("all changes")
-        
-        f.write("""</code></span>
+                    <span><strong>Path:</strong> <code>{paths}</code></span>
                 </div>
                 <div class="meta-item">
                     <span>⏰</span>
-                    <span><strong>Generated:</strong> """)
-        
-        f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        
-        f.write("""</span>
+                    <span><strong>Generated:</strong> {generated}</span>
                 </div>
             </div>
         </div>
         
-        <div class="content">
+"""
+
+# Summary cards and the start of the commits table; filled in with the range stats
+_SUMMARY_TMPL = """        <div class="content">
             <div class="section">
                 <h2>📊 Summary</h2>
                 <div class="summary">
                     <div class="stat-card">
-                        <div class="stat-number">""")
-        
-        f.write(f"{stats['commits']}")
-        f.write("""</div>
+                        <div class="stat-number">{commits}</div>
                         <div class="stat-label">Commits</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number">""")
-        
-        f.write(f"{stats['files']}")
-        f.write("""</div>
+                        <div class="stat-number">{files}</div>
                         <div class="stat-label">Files Changed</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number">""")
-        
-        f.write(f"{stats['lines_added']}")
-        f.write("""</div>
+                        <div class="stat-number">{lines_added}</div>
                         <div class="stat-label">Lines Added</div>
                     </div>
                     <div class="stat-card">
-                        <div class="stat-number">""")
-        
-        f.write(f"{stats['lines_removed']}")
-        f.write("""</div>
+                        <div class="stat-number">{lines_removed}</div>
                         <div class="stat-label">Lines Removed</div>
                     </div>
                 </div>
@@ -853,23 +1349,22 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
                             <th>Date</th>
                         </tr>
                     </thead>
-                    <tbody>""")
-        
-        for commit in commits:
-            badge_class = commit['type'] if commit['type'] in ['feat', 'fix', 'chore', 'docs', 'refactor'] else 'chore'
-            commit_url = f"{repo_url}/commit/{commit['hash']}"
-            f.write(f"""
+                    <tbody>"""
+
+# One row of the commits table
+_COMMIT_ROW_TMPL = """
                         <tr>
-                            <td><a href="{commit_url}" class="commit-hash" target="_blank">{commit['hash']}</a></td>
+                            <td><a href="{commit_url}" class="commit-hash" target="_blank">{hash}</a></td>
                             <td>
-                                <span class="badge {badge_class}">{commit['type']}</span>
-                                <span class="commit-message">{html.escape(commit['message'])}</span>
+                                <span class="badge {badge_class}">{type}</span>
+                                <span class="commit-message">{message}</span>
                             </td>
-                            <td><span class="commit-author">{html.escape(commit['author'])}</span></td>
-                            <td><span class="commit-date">{commit['date']}</span></td>
-                        </tr>""")
-        
-        f.write("""
+                            <td><span class="commit-author">{author}</span></td>
+                            <td><span class="commit-date">{date}</span></td>
+                        </tr>"""
+
+# End of the commits table and start of the changed files list
+_FILES_SECTION_OPEN = """
                     </tbody>
                 </table>
             </div>
@@ -877,65 +1372,19 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             <div class="section">
                 <h2>📁 Files Changed</h2>
                 <div class="files-list">
-                    <ul>""")
-        
-        for file in stats['file_list']:
-            f.write(f"<li><code>{html.escape(file)}</code></li>")
-        
-        f.write("""
+                    <ul>"""
+
+# End of the changed files list and start of the per-commit details
+_DETAILS_SECTION_OPEN = """
                     </ul>
                 </div>
             </div>
             
             <div class="section">
-                <h2>🔍 Detailed Changes</h2>""")
-        
-        for i, commit in enumerate(commits):
-            details = get_commit_details(commit['hash'], paths, repo_dir)
-            badge_class = commit['type'] if commit['type'] in ['feat', 'fix', 'chore', 'docs', 'refactor'] else 'chore'
-            
-            f.write(f"""
-                <div class="commit-detail">
-                    <div class="commit-header">
-                        <div class="commit-title">
-                            <a href="{repo_url}/commit/{commit['hash']}" class="commit-hash-large" target="_blank">{commit['hash']}</a>
-                            <span class="badge {badge_class}">{commit['type']}</span>
-                        </div>
-                        <div class="commit-meta">
-                            <span>👤 {html.escape(details['author'])}</span>
-                            <span>📅 {details['date']}</span>
-                            <span>📁 {len(details['files'])} files</span>
-                        </div>
-                        <div style="margin-top: 8px; color: #e6edf3; font-size: 0.9em;">
-                            {html.escape(details['message'])}
-                        </div>
-                        <div class="commit-actions">
-                            <button class="toggle-button secondary" onclick="toggleFiles('files-{i}')">📁 Files ({len(details['files'])})</button>
-                            <button class="toggle-button" onclick="toggleDiff('diff-{i}')">🔍 Code Changes</button>
-                        </div>""")
-            
-            if details['files']:
-                f.write(f"""
-                        <div id="files-{i}" class="collapsible">
-                            <div class="files-list">
-                                <ul>""")
-                for file in details['files']:
-                    f.write(f"<li>{html.escape(file)}</li>")
-                f.write("</ul></div></div>")
-            
-            if details['diff']:
-                f.write(f"""
-                        <div id="diff-{i}" class="collapsible">
-                            <div class="diff-container">
-                                {format_diff_as_html(details['diff'], commit['hash'], repo_url)}
-                            </div>
-                        </div>""")
-            
-            f.write("""
-                    </div>
-                </div>""")
-        
-        f.write("""
+                <h2>🔍 Detailed Changes</h2>"""
+
+# Closes the report and adds its scripts (collapsibles, hover links, shortcuts)
+_FOOTER_HTML = """
             </div>
         </div>
     </div>
@@ -951,6 +1400,31 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
         function toggleDiff(id) {
             const element = document.getElementById(id);
             element.classList.toggle('show');
+            loadDiff(element);
+        }
+        
+        // Reports written with --lazy-diffs keep each diff in diffs/<hash>.js next to
+        // the report; a script tag (unlike fetch) also works for reports opened from disk
+        function loadDiff(element) {
+            const container = element.querySelector('.diff-container[data-diff-src]');
+            if (!container || container.dataset.loading) {
+                return;
+            }
+            container.dataset.loading = 'true';
+            const script = document.createElement('script');
+            script.src = container.dataset.diffSrc;
+            script.onerror = function() {
+                container.querySelector('.hunk-header').textContent = `Could not load ${container.dataset.diffSrc}`;
+            };
+            document.body.appendChild(script);
+        }
+        
+        // Called by a diffs/<hash>.js script with the commit's rendered diff
+        function renderDiff(hash, diffHtml) {
+            const container = document.querySelector(`.diff-container[data-diff-hash="${hash}"]`);
+            if (container) {
+                container.innerHTML = diffHtml;
+            }
         }
         
         
@@ -961,6 +1435,24 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             });
         }
         
+        // Build a diff line's GitHub link the first time it is hovered, from the
+        // commit's blob URL and the path of the file section containing it
+        document.addEventListener('mouseover', function(e) {
+            const line = e.target.closest('.file-section .line');
+            if (!line || line.querySelector('.github-link')) {
+                return;
+            }
+            const blobUrl = line.closest('.diff-container').dataset.blobUrl;
+            const file = line.closest('.file-section').dataset.file;
+            const lineNumber = line.querySelector('.line-number').textContent.replace(/^[+-]/, '');
+            const link = document.createElement('a');
+            link.href = `${blobUrl}${line.classList.contains('removed') ? '~1' : ''}/${file}#L${lineNumber}`;
+            link.className = 'github-link';
+            link.target = '_blank';
+            link.textContent = '🔗';
+            line.querySelector('.line-content').appendChild(link);
+        });
+        
         // Show/hide scroll to top button
         window.addEventListener('scroll', function() {
             const scrollBtn = document.getElementById('scrollBtn');
@@ -976,6 +1468,7 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
             const firstDiff = document.getElementById('diff-0');
             if (firstDiff) {
                 firstDiff.classList.add('show');
+                loadDiff(firstDiff);
             }
             
             // Add keyboard shortcuts
@@ -992,6 +1485,7 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
                             const firstDiff = document.getElementById('diff-0');
                             if (firstDiff) {
                                 firstDiff.classList.toggle('show');
+                                loadDiff(firstDiff);
                             }
                             break;
                     }
@@ -1000,7 +1494,168 @@ def generate_html_report(start_commit, end_commit, paths=None, output_file=None,
         });
     </script>
 </body>
-</html>""")
+</html>"""
+
+@contextlib.contextmanager
+def open_report(output_file, **open_args):
+    """Open a temporary file for writing a report and move it over output_file once the
+    block completes, so an interrupted run never leaves a truncated report behind"""
+    tmp_path = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', **open_args) as f:
+            yield f
+        os.replace(tmp_path, output_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_empty_report(output_file, start_commit, end_commit, paths=None):
+    """Write a minimal HTML report for a range with no commits"""
+    scope = escape_text(', '.join(paths)) if paths else 'All changes'
+    with open_report(output_file) as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Code Review Report</title>
+    <style>
+        body {{
+            font-family: 'SF Mono', 'Monaco', 'Inconsolata', 'Roboto Mono', 'Source Code Pro', monospace;
+            background-color: #0d1117;
+            color: #e6edf3;
+            padding: 40px;
+        }}
+        code {{
+            color: #58a6ff;
+        }}
+    </style>
+</head>
+<body>
+    <h1>🔍 Code Review Report</h1>
+    <p>No commits in <code>{escape_text(start_commit)}..{escape_text(end_commit)}</code> touch the reviewed paths.</p>
+    <p>Paths: {scope}</p>
+    <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+</body>
+</html>
+""")
+
+def generate_html_report(start_commit, end_commit, paths=None, output_file=None, repo_url=None, proposal_id=None, repo_dir=None, force_full=False, no_diff=False, find_renames=False, lazy_diffs=False, first_parent=False):
+    """Generate a comprehensive HTML review report with side-by-side view"""
+    
+    if output_file is None:
+        # Generate filename with proposal ID and date (if available from config)
+        date_str = datetime.now().strftime('%Y%m%d')
+        proposal_id = None
+        
+        # Try to read proposal ID from config file
+        config_file = '.review-config'
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                config_content = f.read()
+                id_match = _ID_RE.search(config_content)
+                if id_match:
+                    proposal_id = id_match.group(1)
+        
+        if proposal_id:
+            # Extract repo name from repo_url or use default
+            if repo_url and repo_url != 'https://github.com/dfinity/ic':
+                repo_name = repo_url.split('/')[-1].replace('.git', '')
+                if not repo_name:
+                    repo_name = repo_url.split('/')[-2]
+            else:
+                repo_name = 'ic'
+            folder_name = f"{proposal_id}-{repo_name}-{date_str}"
+        else:
+            # Fallback to old format if no proposal ID
+            if paths:
+                if isinstance(paths, list):
+                    path_short = '-'.join([slugify(p) for p in paths])
+                else:
+                    path_short = slugify(paths)
+            else:
+                path_short = 'all-changes'
+            commit_short = f"{start_commit[:8]}-{end_commit[:8]}"
+            folder_name = f"{date_str}-review-{path_short}-{commit_short}"
+        os.makedirs(f"generated/{folder_name}", exist_ok=True)
+        output_file = f"generated/{folder_name}/{folder_name}.html"
+    
+    print(f"Generating HTML report for {start_commit}..{end_commit}")
+    
+    # Nothing to review; skip the log pass and all per-commit work
+    count_argv = ['rev-list', '--count', *history_options(first_parent), f'{start_commit}..{end_commit}'] + (['--'] + paths if paths else [])
+    if run_git_command(count_argv, repo_dir) == '0':
+        write_empty_report(output_file, start_commit, end_commit, paths)
+        print(f"✓ No changes in range, empty HTML report generated: {output_file}")
+        return output_file
+    
+    # The header shows the range as requested and the generation time, so it is rendered
+    # on every run and only the rest of the report goes into the report cache
+    header = _HEADER_TMPL.format(
+        css=_CSS,
+        range_start=start_commit[:8],
+        range_end=end_commit[:8],
+        paths=escape_text(', '.join(paths) if isinstance(paths, list) else paths) if paths else 'all changes',
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M')
+    )
+    
+    # Reuse the last report generated for the same resolved range and options; a
+    # --lazy-diffs report is not self-contained, so its diff files are always written
+    report_record = None
+    shas = resolve_range(start_commit, end_commit, repo_dir)
+    if shas and not lazy_diffs:
+        report_record = review_cache_path('report', *shas, ','.join(paths or ()), repo_url, proposal_id, force_full, no_diff, find_renames,
+                                           first_parent)
+        last_report = read_review_cache(report_record)
+        if last_report is not None:
+            with open_report(output_file) as f:
+                f.write(header)
+                f.write(last_report)
+            print(f"✓ Range unchanged since the last report, reusing it: {output_file}")
+            return output_file
+    
+    # Get statistics
+    index = RangeIndex.for_range(start_commit, end_commit, paths, repo_dir, force_full, with_diffs=not no_diff, find_renames=find_renames,
+                                 first_parent=first_parent)
+    stats = index.stats()
+    commits = index.commits
+    
+    # Diff files go first so a published report never points at missing ones
+    if lazy_diffs:
+        write_diff_sidecars(commits, index, os.path.join(os.path.dirname(output_file), 'diffs'))
+    
+    with open_report(output_file, buffering=1 << 20) as f:
+        f.write(header)
+        f.write(_SUMMARY_TMPL.format(**stats))
+        
+        rows = []
+        for commit in commits:
+            badge_class = commit['type'] if commit['type'] in ['feat', 'fix', 'chore', 'docs', 'refactor'] else 'chore'
+            rows.append(_COMMIT_ROW_TMPL.format_map({
+                'commit_url': f"{repo_url}/commit/{commit['hash']}",
+                'hash': commit['hash'],
+                'badge_class': badge_class,
+                'type': commit['type'],
+                'message': escape_text(commit['message']),
+                'author': cached_escape(commit['author']),
+                'date': commit['date'],
+            }))
+        f.write(''.join(rows))
+        
+        f.write(_FILES_SECTION_OPEN)
+        
+        f.write(''.join([f"<li><code>{cached_escape(file)}</code></li>" for file in stats['file_list']]))
+        
+        f.write(_DETAILS_SECTION_OPEN)
+        
+        for fragment in iter_commits_html(commits, index, repo_url, lazy_diffs):
+            f.write(fragment)
+        
+        f.write(_FOOTER_HTML)
+    
+    if report_record and not index.failed:
+        with open(output_file, 'r') as f:
+            write_review_cache(report_record, f.read()[len(header):])
     
     print(f"✓ HTML report generated: {output_file}")
     return output_file
@@ -1015,6 +1670,12 @@ def main():
     parser.add_argument('--repo', required=True, help='Repository URL (e.g., https://github.com/dfinity/ic.git)')
     parser.add_argument('--proposal-id', help='NNS proposal ID to include in the review')
     parser.add_argument('--cache-dir', default='.repo-cache', help='Directory to cache cloned repositories')
+    parser.add_argument('--force-full', action='store_true', help='Always render full diffs, even for very large commits')
+    parser.add_argument('--no-diff', action='store_true', help='Only list commits and changed files; skip rendering diffs')
+    parser.add_argument('--lazy-diffs', action='store_true', help='Write each diff to diffs/<hash>.js next to the report and load it when opened')
+    parser.add_argument('--first-parent', action='store_true', help='Only review commits on the end commit\'s first-parent line (merges stand in for their branches)')
+    parser.add_argument('--find-renames', action='store_true', help='Detect renamed files (slower); by default a rename shows as a delete plus an add')
+    parser.add_argument('--no-commit-graph', action='store_true', help='Do not write a commit-graph with changed-path filters in the cached repository')
     
     args = parser.parse_args()
     
@@ -1024,13 +1685,14 @@ def main():
         sys.exit(1)
     
     print(f"🔍 Using external repository: {args.repo}")
-    repo_dir = get_cached_repo(args.repo, args.cache_dir)
+    repo_dir = get_cached_repo(args.repo, args.cache_dir, commit_graph=not args.no_commit_graph, commits=(args.start, args.end))
     if not repo_dir:
         print("❌ Failed to get cached repository")
         sys.exit(1)
     
+    paths = normalize_review_paths(args.path)
     output_file = args.output  # Let the function generate the name if not provided
-    generate_html_report(args.start, args.end, args.path, output_file, args.repo_url, args.proposal_id, repo_dir)
+    generate_html_report(args.start, args.end, paths, output_file, args.repo_url, args.proposal_id, repo_dir, args.force_full, args.no_diff, args.find_renames, args.lazy_diffs, args.first_parent)
 
 if __name__ == '__main__':
     main()
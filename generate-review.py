@@ -4,14 +4,46 @@ Generate beautiful markdown code review reports with side-by-side comparisons
 """
 
 import subprocess
+import io
 import sys
 import os
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import argparse
+import functools
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import shutil
 
+GIT = shutil.which('git') or 'git'
+
+# Git subprocesses run at once when independent queries are issued in parallel
+GIT_WORKERS = min(12, os.cpu_count() or 4)
+
+# Options for every git command that computes diffs: skip textconv filters and external
+# diff drivers, show submodule bumps as commit ids only (never a log of the submodule),
+# and use the histogram algorithm
+_DIFF_FAST_FLAGS = ('--no-textconv', '--no-ext-diff', '--submodule=short', '--diff-algorithm=histogram')
+
+# Similarity threshold used when rename detection is requested with --find-renames
+RENAME_THRESHOLD = '50%'
+
+# Proposal ID saved in .review-config, e.g. "ID := 138584"
+_ID_RE = re.compile(r'ID := (\d+)')
+
+# Abbreviations used in report file names, applied after '/' has become '-'
+_SLUG_MAP = {'rs-': '', 'sns-governance': 'sns-gov', 'nns-governance': 'nns-gov'}
+_SLUG_RE = re.compile('|'.join(re.escape(key) for key in _SLUG_MAP))
+
+def slugify(path):
+    """Short file-name form of a review path, e.g. rs/sns/governance -> sns-gov"""
+    return _SLUG_RE.sub(lambda m: _SLUG_MAP[m.group(0)], path.replace('/', '-'))
+
+# A full or abbreviated commit hash, as opposed to a ref name such as HEAD
+_SHA_RE = re.compile(r'[0-9a-f]{7,40}')
+
 def clone_external_repo(repo_url):
     """Clone external repository to temporary directory"""
     temp_dir = tempfile.mkdtemp(prefix='markdown_review_')
@@ -26,8 +58,19 @@ def clone_external_repo(repo_url):
         shutil.rmtree(temp_dir, ignore_errors=True)
         return None
 
-def get_cached_repo(repo_url, cache_dir):
-    """Get or clone repository to cache directory"""
+def has_commits(repo_dir, commits):
+    """Check that every commit (full or abbreviated hash) exists in repo_dir, using one cat-file"""
+    result = subprocess.run(git_argv(['cat-file', '--batch-check'], repo_dir),
+                            input=''.join(f"{commit}^{{commit}}\n" for commit in commits),
+                            capture_output=True, text=True, check=False)
+    lines = result.stdout.splitlines()
+    return result.returncode == 0 and len(lines) == len(commits) and all(line.split()[1:2] == ['commit'] for line in lines)
+
+def get_cached_repo(repo_url, cache_dir, commits=()):
+    """Get or clone repository to cache directory
+
+    An existing cache is only updated when one of commits is not a hash already in it.
+    """
     # Create a safe directory name from the repo URL
     repo_name = repo_url.split('/')[-1].replace('.git', '')
     if not repo_name:
@@ -35,12 +78,19 @@ def get_cached_repo(repo_url, cache_dir):
     
     cached_repo_path = os.path.join(cache_dir, repo_name)
     
-    if os.path.exists(cached_repo_path):
+    # Hashes never change, unlike refs such as HEAD which have to follow the remote
+    pinned = bool(commits) and all(_SHA_RE.fullmatch(commit) for commit in commits)
+    
+    if os.path.exists(cached_repo_path) and pinned and has_commits(cached_repo_path, commits):
+        print(f"🔄 Using cached repository: {cached_repo_path}")
+        print(f"✅ Requested commits already cached, skipping update")
+    elif os.path.exists(cached_repo_path):
         print(f"🔄 Using cached repository: {cached_repo_path}")
         print(f"📥 Updating repository...")
         try:
-            # Update the cached repository
-            subprocess.run(['git', 'pull'], cwd=cached_repo_path, 
+            # Missing hashes only need the objects; refs need the branch moved as well
+            argv = ['fetch', '--quiet', 'origin'] if pinned else ['pull', '--quiet']
+            subprocess.run(git_argv(argv, cached_repo_path),
                          capture_output=True, text=True, check=True)
             print(f"✅ Repository updated")
         except subprocess.CalledProcessError as e:
@@ -59,134 +109,289 @@ def get_cached_repo(repo_url, cache_dir):
     
     return cached_repo_path
 
-def run_git_command(cmd, cwd=None):
-    """Run a git command and return the output"""
+def git_argv(argv, repo_dir=None):
+    """Build a full git command line, using `git -C` to target repo_dir"""
+    if repo_dir:
+        return [GIT, '-C', repo_dir] + argv
+    return [GIT] + argv
+
+def path_args(paths):
+    """Pathspec arguments limiting a git command to paths (a list or a single path)"""
+    if not paths:
+        return []
+    if isinstance(paths, str):
+        return ['--', paths]
+    return ['--'] + list(paths)
+
+def run_git_command(argv, repo_dir=None):
+    """Run a git command (argv list without the leading 'git') and return the output"""
+    cmd = git_argv(argv, repo_dir)
     try:
-        result = subprocess.run(cmd, shell=True, cwd=cwd, capture_output=True, text=True)
+        result = subprocess.run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
-            print(f"Error running command: {cmd}")
+            print(f"Error running command: {' '.join(cmd)}")
             print(f"Error: {result.stderr}")
             return ""
         return result.stdout.strip()
     except Exception as e:
-        print(f"Exception running command: {cmd}")
+        print(f"Exception running command: {' '.join(cmd)}")
         print(f"Exception: {e}")
         return ""
 
-def get_commit_stats(start_commit, end_commit, paths=None, repo_dir=None):
-    """Get statistics for the commit range"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
+def iter_git_lines(argv, repo_dir=None):
+    """Run a git command (argv list without the leading 'git') and yield its output one line at a time, without the newline"""
+    cmd = git_argv(argv, repo_dir)
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, encoding='utf-8', errors='replace',
+                                bufsize=1 << 20)
+    except Exception as e:
+        print(f"Exception running command: {' '.join(cmd)}")
+        print(f"Exception: {e}")
+        return
+    with proc:
+        for line in proc.stdout:
+            yield line.rstrip('\n')
+    if proc.returncode != 0:
+        print(f"Error running command: {' '.join(cmd)}")
+
+class CommitMetaReader:
+    """Read commit author, date and subject from one long-lived `git cat-file --batch`
+
+    Use as a context manager; read() may be called from several threads.
+    """
+    
+    def __init__(self, repo_dir=None):
+        self.cmd = git_argv(['cat-file', '--batch'], repo_dir)
+        self.proc = None
+        self.lock = threading.Lock()
     
-    # Count commits
-    commit_count = run_git_command(f"git rev-list --count {start_commit}..{end_commit}{path_filter}", repo_dir)
+    def __enter__(self):
+        self.proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self
+    
+    def __exit__(self, *exc):
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+        self.proc.wait()
+    
+    def read(self, commit_hash):
+        """Get a commit's author ("Name <email>"), date (YYYY-MM-DD, author's timezone)
+        and subject, as `git show --format='%an <%ae>'/'%ad' --date=short/'%s'` would"""
+        with self.lock:
+            self.proc.stdin.write(f"{commit_hash}\n".encode())
+            self.proc.stdin.flush()
+            # "<sha> commit <size>" followed by the object and a newline, or "<name> missing"
+            header = self.proc.stdout.readline().split()
+            if len(header) != 3 or header[1] != b'commit':
+                print(f"Error reading commit: {commit_hash}")
+                return {'author': '', 'date': '', 'message': ''}
+            body = self.proc.stdout.read(int(header[2]) + 1)[:-1].decode('utf-8', 'replace')
+        
+        headers, _, message = body.partition('\n\n')
+        author = date = ''
+        for line in headers.split('\n'):
+            if line.startswith('author '):
+                # "author Name <email> 1700000000 +0100"
+                author, timestamp, offset = line[len('author '):].rsplit(' ', 2)
+                minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+                tz = timezone(timedelta(minutes=-minutes if offset[0] == '-' else minutes))
+                date = datetime.fromtimestamp(int(timestamp), tz).strftime('%Y-%m-%d')
+                break
+        # The subject is the message's first paragraph, joined onto one line
+        subject = ' '.join(line.strip() for line in message.strip('\n').split('\n\n', 1)[0].split('\n'))
+        return {'author': author, 'date': date, 'message': subject}
+
+def rename_option(find_renames=False):
+    """git diff option for rename detection, which is off unless explicitly requested"""
+    return f"--find-renames={RENAME_THRESHOLD}" if find_renames else "--no-renames"
+
+def history_options(first_parent=False):
+    """git log options selecting which commits of the range are reviewed"""
+    return ['--first-parent'] if first_parent else []
+
+def merge_diff_option(first_parent=False):
+    """How merges are diffed: against their first parent when they stand in for a whole
+    branch (--first-parent), otherwise as a combined diff like `git show`"""
+    return '--diff-merges=first-parent' if first_parent else '--cc'
+
+def range_cache(func):
+    """Cache a (start_commit, end_commit, paths, repo_dir) query for the rest of the run
+
+    paths may be a list, so it is normalized to a hashable tuple first. Results
+    are shared between callers and must not be modified.
+    """
+    cached = functools.lru_cache(maxsize=64)(func)
     
-    # Get file list
-    files_output = run_git_command(f"git diff --name-only {start_commit}..{end_commit}{path_filter}", repo_dir)
-    files = [f for f in files_output.split('\n') if f.strip()]
-    file_count = len(files)
+    @functools.wraps(func)
+    def wrapper(start_commit, end_commit, paths=None, repo_dir=None, **options):
+        if isinstance(paths, str):
+            paths = [paths]
+        return cached(start_commit, end_commit, tuple(paths) if paths else None, repo_dir, **options)
     
-    # Get diff stats
-    diff_stats = run_git_command(f"git diff --stat {start_commit}..{end_commit}{path_filter}", repo_dir)
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+@range_cache
+def get_commit_stats(start_commit, end_commit, paths=None, repo_dir=None, find_renames=False, first_parent=False):
+    """Get statistics for the commit range"""
+    return collect_range_info(start_commit, end_commit, paths, repo_dir, find_renames, first_parent)
+
+def collect_range_info(start_commit, end_commit, paths=None, repo_dir=None, find_renames=False, first_parent=False):
+    """Count commits, changed files and changed lines in the range with a single git log
+
+    Files are every path touched by a commit in the range and line counts are
+    summed over those commits, matching the HTML report's statistics.
+    """
+    # Each commit is a \x01-prefixed hash line followed by its --raw and --numstat entries
+    lines = iter_git_lines(['log', '--raw', '--numstat', rename_option(find_renames), *_DIFF_FAST_FLAGS, '--format=%x01%H',
+                           *history_options(first_parent), f'{start_commit}..{end_commit}'] + path_args(paths), repo_dir)
     
-    # Parse lines added/removed from the last line of diff --stat
+    commit_count = 0
+    files = set()
     lines_added = 0
     lines_removed = 0
-    if diff_stats:
-        lines = diff_stats.split('\n')
-        if lines:
-            last_line = lines[-1]
-            if '|' in last_line:
-                parts = last_line.split('|')
-                if len(parts) >= 2:
-                    changes = parts[1].strip()
-                    if '+' in changes and '-' in changes:
-                        # Extract numbers from "X files changed, Y insertions(+), Z deletions(-)"
-                        import re
-                        insertions = re.search(r'(\d+)\s*insertions?', changes)
-                        deletions = re.search(r'(\d+)\s*deletions?', changes)
-                        if insertions:
-                            lines_added = int(insertions.group(1))
-                        if deletions:
-                            lines_removed = int(deletions.group(1))
+    for line in lines:
+        if line.startswith('\x01'):
+            commit_count += 1
+        elif line.startswith(':'):
+            # --raw entry; the last tab-separated field is the (new) path
+            files.add(line.rsplit('\t', 1)[-1])
+        elif line:
+            # "added<TAB>removed<TAB>path"; binary files show "-" for both counts
+            added, removed, _ = line.split('\t', 2)
+            if added != '-':
+                lines_added += int(added)
+                lines_removed += int(removed)
     
+    files = sorted(files)
     return {
         'commits': commit_count,
-        'files': file_count,
+        'files': len(files),
         'lines_added': lines_added,
         'lines_removed': lines_removed,
         'file_list': files
     }
 
-def get_commits(start_commit, end_commit, paths=None, repo_dir=None):
+@range_cache
+def get_commits(start_commit, end_commit, paths=None, repo_dir=None, first_parent=False):
     """Get list of commits in the range"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
-    
-    format_str = "%H|%s|%an|%ad"
-    output = run_git_command(f"git log --format='{format_str}' --date=short {start_commit}..{end_commit}{path_filter}", repo_dir)
+    # One line per commit with \x1f-separated fields; subjects and names may contain '|'
+    lines = iter_git_lines(['log', '--format=%H%x1f%s%x1f%an%x1f%ad', '--date=short', *history_options(first_parent),
+                           f'{start_commit}..{end_commit}'] + path_args(paths), repo_dir)
     commits = []
-    for line in output.split('\n'):
-        if line.strip():
-            parts = line.split('|', 3)
-            if len(parts) >= 4:
-                commits.append({
-                    'hash': parts[0],
-                    'message': parts[1],
-                    'author': parts[2],
-                    'date': parts[3]
-                })
+    for line in lines:
+        commit_hash, message, author, date = line.split('\x1f', 3)
+        commits.append({
+            'hash': commit_hash,
+            'message': message,
+            'author': author,
+            'date': date
+        })
     return commits
 
-def get_commit_details(commit_hash, paths=None, repo_dir=None):
-    """Get detailed information about a specific commit"""
-    # Build path filter for git commands
-    if paths:
-        if isinstance(paths, list):
-            path_filter = " -- " + " ".join(paths)
-        else:
-            path_filter = f" -- {paths}"
-    else:
-        path_filter = ""
-    
+def get_commit_details(commit_hash, paths=None, repo_dir=None, find_renames=False, meta_reader=None, first_parent=False):
+    """Get detailed information about a specific commit
+
+    Pass a CommitMetaReader to look up many commits without a cat-file process each.
+    """
     # Get commit info
-    author = run_git_command(f"git show --no-patch --format='%an <%ae>' {commit_hash}", repo_dir)
-    date = run_git_command(f"git show --no-patch --format='%ad' --date=short {commit_hash}", repo_dir)
-    message = run_git_command(f"git show --no-patch --format='%s' {commit_hash}", repo_dir)
+    if meta_reader is None:
+        with CommitMetaReader(repo_dir) as reader:
+            meta = reader.read(commit_hash)
+    else:
+        meta = meta_reader.read(commit_hash)
     
     # Get files changed
-    files = run_git_command(f"git show --name-only --format='' {commit_hash}{path_filter}", repo_dir)
+    files = run_git_command(['show', '--name-only', '--format=', merge_diff_option(first_parent), rename_option(find_renames), *_DIFF_FAST_FLAGS, commit_hash] + path_args(paths), repo_dir)
     file_list = [f for f in files.split('\n') if f.strip()]
     
     # Get diff
-    diff = run_git_command(f"git show {commit_hash}{path_filter}", repo_dir)
+    diff = run_git_command(['show', '--date=default', '--no-decorate', '--no-abbrev-commit', '--no-use-mailmap', merge_diff_option(first_parent), rename_option(find_renames), *_DIFF_FAST_FLAGS, commit_hash] + path_args(paths), repo_dir)
     
     return {
-        'author': author,
-        'date': date,
-        'message': message,
+        'author': meta['author'],
+        'date': meta['date'],
+        'message': meta['message'],
         'files': file_list,
         'diff': diff
     }
 
-def generate_markdown_report(start_commit, end_commit, paths=None, output_file=None, proposal_id=None, repo_dir=None, repo_url=None):
+@range_cache
+def get_all_commit_details(start_commit, end_commit, paths=None, repo_dir=None, find_renames=False, first_parent=False):
+    """Get detailed information about every commit in the range with a single git log
+
+    Returns a dict of commit hash -> details, with the same fields and diff text
+    get_commit_details produces for one commit.
+    """
+    # Same output as running `git show` on each commit, plus --raw entries for the file lists
+    lines = iter_git_lines(['log', '--raw', '-p', merge_diff_option(first_parent), '--format=medium', '--date=default', '--no-decorate', '--no-color',
+                           '--no-abbrev-commit', '--no-use-mailmap', rename_option(find_renames), *_DIFF_FAST_FLAGS, *history_options(first_parent),
+                           f'{start_commit}..{end_commit}'] + path_args(paths), repo_dir)
+    
+    all_details = {}
+    details = None
+    for line in lines:
+        if line.startswith('commit ') and len(line.split()) == 2:
+            details = {'author': '', 'date': '', 'message': '', 'files': [], 'diff': ''}
+            all_details[line.split()[1]] = details
+            diff_lines = [line]
+            subject_lines = []
+            header_done = False
+            after_raw = False
+            details['diff'] = diff_lines
+            continue
+        if details is None:
+            continue
+        if line.startswith(':'):
+            # --raw entry (not part of `git show` output); the last field is the (new) path
+            details['files'].append(line.rsplit('\t', 1)[-1])
+            header_done = after_raw = True
+            continue
+        if after_raw and not line:
+            # Blank line git puts between the --raw entries and the patch
+            after_raw = False
+            continue
+        diff_lines.append(line)
+        if line.startswith('diff '):
+            # The patch begins; a commit with an empty message has no subject lines
+            header_done = True
+        if header_done:
+            continue
+        if line.startswith('Author: '):
+            details['author'] = line[len('Author: '):]
+        elif line.startswith('Date: '):
+            date = datetime.strptime(line[len('Date: '):].strip(), '%a %b %d %H:%M:%S %Y %z')
+            details['date'] = date.strftime('%Y-%m-%d')
+        elif line.startswith('    ') and line.strip():
+            # The subject is the message's first paragraph, joined onto one line
+            subject_lines.append(line.strip())
+            details['message'] = ' '.join(subject_lines)
+        elif subject_lines:
+            header_done = True
+    
+    for details in all_details.values():
+        details['diff'] = '\n'.join(details['diff']).strip()
+    
+    return all_details
+
+@contextlib.contextmanager
+def open_report(output_file, **open_args):
+    """Open a temporary file for writing a report and move it over output_file once the
+    block completes, so an interrupted run never leaves a truncated report behind"""
+    tmp_path = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', **open_args) as f:
+            yield f
+        os.replace(tmp_path, output_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def generate_markdown_report(start_commit, end_commit, paths=None, output_file=None, proposal_id=None, repo_dir=None, repo_url=None, find_renames=False, first_parent=False):
     """Generate a comprehensive markdown review report"""
     
     if output_file is None:
         # Generate filename with proposal ID and date (if available from config)
-        from datetime import datetime
         date_str = datetime.now().strftime('%Y%m%d')
         proposal_id = None
         
@@ -195,7 +400,7 @@ def generate_markdown_report(start_commit, end_commit, paths=None, output_file=N
         if os.path.exists(config_file):
             with open(config_file, 'r') as f:
                 config_content = f.read()
-                id_match = re.search(r'ID := (\d+)', config_content)
+                id_match = _ID_RE.search(config_content)
                 if id_match:
                     proposal_id = id_match.group(1)
         
@@ -212,9 +417,9 @@ def generate_markdown_report(start_commit, end_commit, paths=None, output_file=N
             # Fallback to old format if no proposal ID
             if paths:
                 if isinstance(paths, list):
-                    path_short = '-'.join([p.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov') for p in paths])
+                    path_short = '-'.join([slugify(p) for p in paths])
                 else:
-                    path_short = paths.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov')
+                    path_short = slugify(paths)
             else:
                 path_short = 'all-changes'
             commit_short = f"{start_commit[:8]}-{end_commit[:8]}"
@@ -224,83 +429,103 @@ def generate_markdown_report(start_commit, end_commit, paths=None, output_file=N
     
     print(f"Generating markdown report for {start_commit}..{end_commit}")
     
-    # Get statistics
-    stats = get_commit_stats(start_commit, end_commit, paths, repo_dir)
-    commits = get_commits(start_commit, end_commit, paths, repo_dir)
+    # The range queries are independent git processes, so run them side by side
+    with ThreadPoolExecutor(max_workers=GIT_WORKERS) as executor:
+        stats_future = executor.submit(get_commit_stats, start_commit, end_commit, paths, repo_dir,
+                                       find_renames=find_renames, first_parent=first_parent)
+        commits_future = executor.submit(get_commits, start_commit, end_commit, paths, repo_dir, first_parent=first_parent)
+        details_future = executor.submit(get_all_commit_details, start_commit, end_commit, paths, repo_dir,
+                                         find_renames=find_renames, first_parent=first_parent)
+        stats = stats_future.result()
+        commits = commits_future.result()
+        all_details = dict(details_future.result())
+        
+        # Fall back to per-commit lookups, in parallel, for anything the bulk pass missed
+        missing = [commit['hash'] for commit in commits if commit['hash'] not in all_details]
+        if missing:
+            with CommitMetaReader(repo_dir) as reader:
+                fetch = lambda h: get_commit_details(h, paths, repo_dir, find_renames, reader, first_parent)
+                for commit_hash, details in zip(missing, executor.map(fetch, missing)):
+                    all_details[commit_hash] = details
     
-    with open(output_file, 'w') as f:
-        # Header
-        f.write("# 📋 Code Review Report\n\n")
-        f.write(f"**Commit Range:** `{start_commit}` → `{end_commit}`\n")
-        if paths:
-            if isinstance(paths, list):
-                f.write(f"**Paths:** `{'`, `'.join(paths)}`\n")
-            else:
-                f.write(f"**Path:** `{paths}`\n")
-        f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    buf = io.StringIO()
+    # Header
+    buf.write("# 📋 Code Review Report\n\n")
+    buf.write(f"**Commit Range:** `{start_commit}` → `{end_commit}`\n")
+    if paths:
+        if isinstance(paths, list):
+            buf.write(f"**Paths:** `{'`, `'.join(paths)}`\n")
+        else:
+            buf.write(f"**Path:** `{paths}`\n")
+    buf.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    # Summary
+    buf.write("## 📊 Summary\n\n")
+    buf.write("| Metric | Value |\n")
+    buf.write("|--------|-------|\n")
+    buf.write(f"| **Total Commits** | {stats['commits']} |\n")
+    buf.write(f"| **Files Changed** | {stats['files']} |\n")
+    buf.write(f"| **Lines Added** | {stats['lines_added']} |\n")
+    buf.write(f"| **Lines Removed** | {stats['lines_removed']} |\n\n")
+    
+    # Commits table
+    buf.write("## 📝 Commits\n\n")
+    buf.write("| Hash | Message | Author | Date |\n")
+    buf.write("|------|---------|--------|------|\n")
+    for commit in commits:
+        # A literal '|' would end the table cell early
+        message = commit['message'].replace('|', '\\|')
+        author = commit['author'].replace('|', '\\|')
+        buf.write(f"| `{commit['hash']}` | {message} | {author} | {commit['date']} |\n")
+    buf.write("\n")
+    
+    # Files changed
+    buf.write("## 📁 Files Changed\n\n")
+    for file in stats['file_list']:
+        buf.write(f"- `{file}`\n")
+    buf.write("\n")
+    
+    # Detailed changes
+    buf.write("## 🔍 Detailed Changes\n\n")
+    for commit in commits:
+        details = all_details[commit['hash']]
         
-        # Summary
-        f.write("## 📊 Summary\n\n")
-        f.write("| Metric | Value |\n")
-        f.write("|--------|-------|\n")
-        f.write(f"| **Total Commits** | {stats['commits']} |\n")
-        f.write(f"| **Files Changed** | {stats['files']} |\n")
-        f.write(f"| **Lines Added** | {stats['lines_added']} |\n")
-        f.write(f"| **Lines Removed** | {stats['lines_removed']} |\n\n")
+        buf.write(f"### Commit `{commit['hash']}`\n\n")
+        buf.write(f"**Author:** {details['author']}  \n")
+        buf.write(f"**Date:** {details['date']}  \n")
+        buf.write(f"**Message:** {details['message']}\n\n")
         
-        # Commits table
-        f.write("## 📝 Commits\n\n")
-        f.write("| Hash | Message | Author | Date |\n")
-        f.write("|------|---------|--------|------|\n")
-        for commit in commits:
-            f.write(f"| `{commit['hash']}` | {commit['message']} | {commit['author']} | {commit['date']} |\n")
-        f.write("\n")
+        if details['files']:
+            buf.write("**Files Changed:**\n")
+            for file in details['files']:
+                buf.write(f"- `{file}`\n")
+            buf.write("\n")
         
-        # Files changed
-        f.write("## 📁 Files Changed\n\n")
-        for file in stats['file_list']:
-            f.write(f"- `{file}`\n")
-        f.write("\n")
+        if details['diff']:
+            buf.write("**Code Changes:**\n\n")
+            buf.write("```diff\n")
+            buf.write(details['diff'])
+            buf.write("\n```\n\n")
         
-        # Detailed changes
-        f.write("## 🔍 Detailed Changes\n\n")
-        for commit in commits:
-            details = get_commit_details(commit['hash'], paths, repo_dir)
-            
-            f.write(f"### Commit `{commit['hash']}`\n\n")
-            f.write(f"**Author:** {details['author']}  \n")
-            f.write(f"**Date:** {details['date']}  \n")
-            f.write(f"**Message:** {details['message']}\n\n")
-            
-            if details['files']:
-                f.write("**Files Changed:**\n")
-                for file in details['files']:
-                    f.write(f"- `{file}`\n")
-                f.write("\n")
-            
-            if details['diff']:
-                f.write("**Code Changes:**\n\n")
-                f.write("```diff\n")
-                f.write(details['diff'])
-                f.write("\n```\n\n")
-            
-            f.write("---\n\n")
+        buf.write("---\n\n")
+    
+    with open_report(output_file, encoding='utf-8') as f:
+        f.write(buf.getvalue())
     
     print(f"✓ Markdown report generated: {output_file}")
     return output_file
 
-def generate_summary_report(start_commit, end_commit, paths=None, output_file=None):
+def generate_summary_report(start_commit, end_commit, paths=None, output_file=None, repo_dir=None, find_renames=False, first_parent=False):
     """Generate a concise summary report"""
     
     if output_file is None:
         # Generate filename with shorthand and date
-        from datetime import datetime
         date_str = datetime.now().strftime('%Y%m%d')
         if paths:
             if isinstance(paths, list):
-                path_short = '-'.join([p.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov') for p in paths])
+                path_short = '-'.join([slugify(p) for p in paths])
             else:
-                path_short = paths.replace('/', '-').replace('rs-', '').replace('sns-governance', 'sns-gov').replace('nns-governance', 'nns-gov')
+                path_short = slugify(paths)
         else:
             path_short = 'all-changes'
         commit_short = f"{start_commit[:8]}-{end_commit[:8]}"
@@ -308,51 +533,47 @@ def generate_summary_report(start_commit, end_commit, paths=None, output_file=No
     
     print(f"Generating summary report for {start_commit}..{end_commit}")
     
-    stats = get_commit_stats(start_commit, end_commit, paths, repo_dir)
-    commits = get_commits(start_commit, end_commit, paths, repo_dir)
+    stats = get_commit_stats(start_commit, end_commit, paths, repo_dir, find_renames=find_renames, first_parent=first_parent)
+    commits = get_commits(start_commit, end_commit, paths, repo_dir, first_parent=first_parent)
     
-    with open(output_file, 'w') as f:
-        f.write("# 📊 Code Review Summary\n\n")
-        f.write(f"**Range:** `{start_commit}` → `{end_commit}`\n")
-        if paths:
-            if isinstance(paths, list):
-                f.write(f"**Paths:** `{'`, `'.join(paths)}`\n")
-            else:
-                f.write(f"**Path:** `{paths}`\n")
-        f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        
-        f.write("## 📈 Overview\n\n")
-        f.write("| Metric | Count |\n")
-        f.write("|--------|-------|\n")
-        f.write(f"| Commits | {stats['commits']} |\n")
-        f.write(f"| Files | {stats['files']} |\n")
-        f.write(f"| Lines Added | {stats['lines_added']} |\n")
-        f.write(f"| Lines Removed | {stats['lines_removed']} |\n\n")
-        
-        f.write("## 📝 Commits\n\n")
-        for commit in commits:
-            f.write(f"- `{commit['hash']}` **{commit['message']}** _({commit['author']}, {commit['date']})_\n")
-        f.write("\n")
-        
-        f.write("## 📁 Files Changed\n\n")
-        for file in stats['file_list']:
-            f.write(f"- `{file}`\n")
-        f.write("\n")
-        
-        # Get overall diff stats
-        if paths:
-            if isinstance(paths, list):
-                path_filter = " -- " + " ".join(paths)
-            else:
-                path_filter = f" -- {paths}"
+    buf = io.StringIO()
+    buf.write("# 📊 Code Review Summary\n\n")
+    buf.write(f"**Range:** `{start_commit}` → `{end_commit}`\n")
+    if paths:
+        if isinstance(paths, list):
+            buf.write(f"**Paths:** `{'`, `'.join(paths)}`\n")
         else:
-            path_filter = ""
-        diff_stats = run_git_command(f"git diff --stat {start_commit}..{end_commit}{path_filter}", repo_dir)
-        if diff_stats:
-            f.write("## 🔍 Change Statistics\n\n")
-            f.write("```\n")
-            f.write(diff_stats)
-            f.write("\n```\n")
+            buf.write(f"**Path:** `{paths}`\n")
+    buf.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+    
+    buf.write("## 📈 Overview\n\n")
+    buf.write("| Metric | Count |\n")
+    buf.write("|--------|-------|\n")
+    buf.write(f"| Commits | {stats['commits']} |\n")
+    buf.write(f"| Files | {stats['files']} |\n")
+    buf.write(f"| Lines Added | {stats['lines_added']} |\n")
+    buf.write(f"| Lines Removed | {stats['lines_removed']} |\n\n")
+    
+    buf.write("## 📝 Commits\n\n")
+    for commit in commits:
+        buf.write(f"- `{commit['hash']}` **{commit['message']}** _({commit['author']}, {commit['date']})_\n")
+    buf.write("\n")
+    
+    buf.write("## 📁 Files Changed\n\n")
+    for file in stats['file_list']:
+        buf.write(f"- `{file}`\n")
+    buf.write("\n")
+    
+    # Get overall diff stats
+    diff_stats = run_git_command(['diff', '--stat', rename_option(find_renames), *_DIFF_FAST_FLAGS, f'{start_commit}..{end_commit}'] + path_args(paths), repo_dir)
+    if diff_stats:
+        buf.write("## 🔍 Change Statistics\n\n")
+        buf.write("```\n")
+        buf.write(diff_stats)
+        buf.write("\n```\n")
+    
+    with open_report(output_file, encoding='utf-8') as f:
+        f.write(buf.getvalue())
     
     print(f"✓ Summary report generated: {output_file}")
     return output_file
@@ -368,6 +589,8 @@ def main():
     parser.add_argument('--proposal-id', help='NNS proposal ID to include in the review')
     parser.add_argument('--cache-dir', default='.repo-cache', help='Directory to cache cloned repositories')
     parser.add_argument('--repo-url', default='https://github.com/dfinity/ic', help='Repository URL for GitHub links')
+    parser.add_argument('--first-parent', action='store_true', help='Only review commits on the end commit\'s first-parent line (merges stand in for their branches)')
+    parser.add_argument('--find-renames', action='store_true', help='Detect renamed files (slower); by default a rename shows as a delete plus an add')
     
     args = parser.parse_args()
     
@@ -377,16 +600,16 @@ def main():
         sys.exit(1)
     
     print(f"🔍 Using external repository: {args.repo}")
-    repo_dir = get_cached_repo(args.repo, args.cache_dir)
+    repo_dir = get_cached_repo(args.repo, args.cache_dir, commits=(args.start, args.end))
     if not repo_dir:
         print("❌ Failed to get cached repository")
         sys.exit(1)
     
     output_file = args.output  # Let the function generate the name if not provided
     if args.type == 'full':
-        generate_markdown_report(args.start, args.end, args.path, output_file, args.proposal_id, repo_dir, args.repo_url)
+        generate_markdown_report(args.start, args.end, args.path, output_file, args.proposal_id, repo_dir, args.repo_url, args.find_renames, args.first_parent)
     else:
-        generate_summary_report(args.start, args.end, args.path, output_file, repo_dir)
+        generate_summary_report(args.start, args.end, args.path, output_file, repo_dir, args.find_renames, args.first_parent)
 
 if __name__ == '__main__':
     main()